@@ -4,19 +4,27 @@ from __future__ import annotations
 import math
 import os
 import sqlite3
+import time
 from datetime import date
+from html import escape
 from typing import Any, List
 
 import streamlit as st
 from storage import HotItemsHistoryDB
 
 DEFAULT_DB_PATH = "hot.db"
+# 同一查询结果在会话内直接复用的时间窗口（秒），与查询缓存的 ttl 保持一致
+RESULT_REUSE_SEC = 300
+# 没有 keyset 游标时，最多允许 OFFSET 跳过这么多页（从首页或末页方向计）
+MAX_OFFSET_PAGES = 50
 
 st.set_page_config(page_title="🔥 热榜历史查询", layout="wide")
 st.title("📚 热榜历史记录")
 
 
+@st.cache_resource
 def get_db() -> HotItemsHistoryDB:
+    # 连接在进程内只建立一次，跨 rerun 复用（保留 SQLite 页缓存）
     if not os.path.exists(DEFAULT_DB_PATH):
         raise FileNotFoundError(f"未找到数据库文件：{DEFAULT_DB_PATH}")
     conn = sqlite3.connect(DEFAULT_DB_PATH, check_same_thread=False)
@@ -25,8 +33,46 @@ def get_db() -> HotItemsHistoryDB:
 
 db = get_db()
 
+
+# ================== 查询缓存 ==================
+# 参数均为可哈希类型；db 不参与哈希，在函数内部通过 get_db() 取得
+# 总数始终是精确的 COUNT(*)：末页按反向排序从末端取、跳页的可达范围都依赖它。
+# snapshot 为时间分桶，总数与各页结果按同一分桶一起失效，末页的页码与内容不会来自不同时刻
+@st.cache_data(ttl=RESULT_REUSE_SEC, max_entries=128)
+def _count(snapshot: int, keyword: str | None, platforms: tuple[str, ...] | None,
+           date_from: str | None, date_to: str | None) -> int:
+    return get_db().count_history(
+        keyword=keyword,
+        platforms=platforms,
+        date_from=date_from,
+        date_to=date_to,
+    )
+
+
+@st.cache_data(ttl=RESULT_REUSE_SEC, max_entries=128)
+def _query(snapshot: int, keyword: str | None, platforms: tuple[str, ...] | None,
+           date_from: str | None, date_to: str | None,
+           order_by: str, page_size: int, offset: int,
+           after_key: Any = None, after_id: int | None = None
+           ) -> tuple[list[dict[str, Any]], tuple[Any, int] | None]:
+    return get_db().query_history_page(
+        keyword=keyword,
+        platforms=platforms,
+        date_from=date_from,
+        date_to=date_to,
+        order_by=order_by,
+        limit=page_size,
+        offset=offset,
+        after_key=after_key,
+        after_id=after_id,
+    )
+
+
 if "page_num" not in st.session_state:
     st.session_state.page_num = 1
+# keyset 翻页游标：页码 -> 上一页最后一行的 (排序列值, id)
+if "cursors" not in st.session_state:
+    st.session_state.cursors = {}
 
 # ================== 侧边栏筛选 ==================
 st.sidebar.header("筛选条件")
@@ -70,45 +116,105 @@ order_map = {
 }
 order_label = st.sidebar.selectbox("排序方式", list(order_map.keys()), index=0)
 order_by = order_map[order_label]
+# 反向排序：末页附近从另一端按 OFFSET 取，再把结果倒回来
+order_col, order_dir = order_by.split()
+reverse_order_by = f"{order_col} {'ASC' if order_dir == 'DESC' else 'DESC'}"
 
 page_size = st.sidebar.selectbox("每页条数", [20, 50, 100, 200], index=1)
 
 # ================== 查询 ==================
-try:
-    total = db.count_history(
-        keyword=keyword or None,
-        platforms=plat_selected or None,
-        date_from=date_from,
-        date_to=date_to,
-    )
-except Exception as e:
-    st.error(f"统计数据失败：{e}")
-    total = 0
+# 选中全部平台等价于不按平台筛选：省掉 IN 条件，查询可以直接走排序列上的索引
+plat_key = None if set(plat_selected) == set(platforms_all) else tuple(sorted(plat_selected)) or None
+
+# 筛选 / 排序 / 每页条数变化后，旧游标全部失效
+query_sig = (keyword, plat_key, date_from, date_to, order_by, page_size)
+if st.session_state.get("query_sig") != query_sig:
+    st.session_state.query_sig = query_sig
+    st.session_state.cursors = {}
+cursors: dict[int, tuple[Any, int]] = st.session_state.cursors
+
+# 与上一次 rerun 的查询条件、页码完全相同（例如只是点了无关控件）时，
+# 直接复用会话里保存的结果，连缓存的哈希查找都省掉；时间分桶保证结果不会无限期陈旧
+snapshot = int(time.time() // RESULT_REUSE_SEC)
+result_key = (query_sig, st.session_state.page_num, snapshot)
+reuse_result = st.session_state.get("last_key") == result_key
+query_ok = True
+
+if reuse_result:
+    total = st.session_state.last_total
+else:
+    try:
+        total = _count(snapshot, keyword or None, plat_key, date_from, date_to)
+    except Exception as e:
+        st.error(f"统计数据失败：{e}")
+        total = 0
+        query_ok = False
 
 total_pages = max(1, math.ceil(total / page_size))
 st.session_state.page_num = min(max(1, st.session_state.page_num), total_pages)
 current_page = st.session_state.page_num
-offset = (current_page - 1) * page_size
 
-try:
-    rows = db.query_history(
-        keyword=keyword or None,
-        platforms=plat_selected or None,
-        date_from=date_from,
-        date_to=date_to,
-        order_by=order_by,
-        limit=page_size,
-        offset=offset,
-    )
-except Exception as e:
-    st.error(f"查询数据失败：{e}")
-    rows = []
+
+def _reachable(page: int) -> bool:
+    """有游标、离首页够近，或离末页够近"""
+    return page in cursors or page <= MAX_OFFSET_PAGES or total_pages - page < MAX_OFFSET_PAGES
+
+
+# 深处的页既没有游标、离两端又都太远时，不做深 OFFSET，改到最近的可达页
+if not _reachable(current_page):
+    target = current_page
+    current_page = max([p for p in cursors if p <= target] + [MAX_OFFSET_PAGES])
+    st.session_state.page_num = current_page
+    st.info(f"第 {target} 页无法直接跳转，已显示第 {current_page} 页；可继续顺序翻页，或缩小筛选范围后再跳转。")
+
+offset = (current_page - 1) * page_size
+# 从末端数的偏移：末页为 0（末页条数可能不满一页）
+reverse_offset = max(0, total - current_page * page_size)
+page_rows = min(page_size, total - (current_page - 1) * page_size)
+use_reverse = current_page > 1 and reverse_offset < offset
+
+# 顺序翻页走 keyset（索引范围扫描）；直接跳页且没有游标时回退到 OFFSET，
+# 靠近末页时按反向排序从末端取，避免深 OFFSET
+if reuse_result:
+    rows, next_cursor = st.session_state.last_rows
+else:
+    cursor = cursors.get(current_page)
+    try:
+        if cursor is not None:
+            rows, next_cursor = _query(snapshot, keyword or None, plat_key, date_from, date_to, order_by, page_size, 0, *cursor)
+        elif use_reverse:
+            rows, _ = _query(snapshot, keyword or None, plat_key, date_from, date_to,
+                             reverse_order_by, max(1, page_rows), reverse_offset)
+            rows = rows[::-1]
+            next_cursor = None
+            if current_page < total_pages and len(rows) == page_size:
+                next_cursor = (rows[-1][order_col], rows[-1]["id"])
+        else:
+            rows, next_cursor = _query(snapshot, keyword or None, plat_key, date_from, date_to, order_by, page_size, offset)
+    except Exception as e:
+        st.error(f"查询数据失败：{e}")
+        rows, next_cursor = [], None
+        query_ok = False
+
+    # 查询失败时不保存，下次 rerun 重新查
+    if query_ok:
+        st.session_state.last_key = (query_sig, current_page, snapshot)
+        st.session_state.last_total = total
+        st.session_state.last_rows = (rows, next_cursor)
+
+# 本页不满（没有下一页游标）说明已到末尾，不依赖 total 是否精确
+has_next = next_cursor is not None and current_page < total_pages
+if has_next:
+    cursors[current_page + 1] = next_cursor
 
 st.caption(f"共查询到 **{total}** 条记录 · 第 **{current_page}/{total_pages}** 页")
 
 # ================== 样式 ==================
-st.markdown(
-    """
+# 注意：Streamlit 每次 rerun 都会清掉本轮没有输出的元素，所以样式仍需每次输出；
+# 这里缓存的是压缩后的字符串（去掉缩进与换行），减小每次 rerun 下发的负载。
+@st.cache_resource
+def _css() -> str:
+    css = """
 <style>
 .card-grid{
   display:flex;
@@ -168,74 +274,93 @@ st.markdown(
   word-break:break-word;
 }
 </style>
-""",
-    unsafe_allow_html=True,
-)
+"""
+    return "".join(line.strip() for line in css.splitlines())
+
+
+st.markdown(_css(), unsafe_allow_html=True)
 
 # ================== 渲染卡片 ==================
 def _fmt(v, default="—"):
-    return v if (v is not None and str(v).strip()) else default
+    # 只有字符串才需要判空白，数值直接返回，避免每个字段都构造一次 str(v)
+    if v is None or (isinstance(v, str) and not v.strip()):
+        return default
+    return v
+
+# 卡片模板：每张卡片只做一次 format，替代逐段 f-string 拼接
+CARD_TMPL = (
+    '<div class="hot-card">'
+    '<div class="card-left">'
+    '<div class="title">{title_html}</div>'
+    '<div class="badges">{badges}</div>'
+    '{excerpt_html}'
+    '</div>'
+    '{right_html}'
+    '</div>'
+)
+BADGES_TMPL = (
+    '<div class="badge">📌 {platform}</div>'
+    '<div class="badge">🏷 排名 {rank}</div>'
+    '<div class="badge">🔥 {heat}</div>'
+    '<div class="badge">📅 {scraped_date}</div>'
+    '<div class="badge">⏱ {scraped_at}</div>'
+)
+
+
+def _card_html(r: dict[str, Any]) -> str:
+    platform_en = _fmt(r.get("platform"))
+    platform = PLATFORM_LABELS.get(platform_en, platform_en)
+
+    # 抓取来的文本一律转义，防止标题/摘要里的 HTML 注入页面
+    title = escape(str(_fmt(r.get("title"), "无标题")))
+    url = escape(r.get("url") or "")
+    excerpt = escape(str(_fmt(r.get("excerpt"), "")))
+    image_url = escape(str(_fmt(r.get("image_url"), "")))
+    heat_text = escape(str(_fmt(r.get("heat_text"))))
+    hv_raw = r.get("heat_value")
+
+    # 热度数值 -> “万”（heat_value 入库时已转成 INTEGER，类型判断即可，无需 try/except）
+    heat_display = heat_text
+    if isinstance(hv_raw, (int, float)):
+        heat_display = f"{hv_raw/10000:.0f}万" if hv_raw >= 10000 else f"{hv_raw:.0f}"
+
+    # 标题可点击
+    if url:
+        title_html = f'<a href="{url}" target="_blank" rel="noopener noreferrer">{title}</a>'
+    else:
+        title_html = title
+
+    badges = BADGES_TMPL.format(
+        platform=escape(str(platform)),
+        rank=escape(str(_fmt(r.get("rank")))),
+        heat=heat_display,
+        scraped_date=escape(str(_fmt(r.get("scraped_date")))),
+        scraped_at=escape(str(_fmt(r.get("scraped_at")))),
+    )
+    excerpt_html = f'<div class="excerpt">{excerpt}</div>' if excerpt and excerpt != "—" else ""
+
+    # 右半部分（图片可选）
+    if image_url and image_url != "—":
+        right_html = f'<div class="card-right"><img src="{image_url}" class="thumb"></div>'
+    else:
+        right_html = '<div class="card-right"></div>'
+
+    return CARD_TMPL.format(
+        title_html=title_html,
+        badges=badges,
+        excerpt_html=excerpt_html,
+        right_html=right_html,
+    )
+
 
 def render_cards(data: list[dict[str, Any]]):
     if not data:
         st.info("暂无数据，换个条件试试。")
         return
 
-    st.markdown('<div class="card-grid">', unsafe_allow_html=True)
-    for r in data:
-        platform_en = _fmt(r.get("platform"))
-        platform = PLATFORM_LABELS.get(platform_en, platform_en)
-
-        title = _fmt(r.get("title"), "无标题")
-        url = r.get("url") or ""
-        rank = _fmt(r.get("rank"))
-        scraped_date = _fmt(r.get("scraped_date"))
-        scraped_at = _fmt(r.get("scraped_at"))
-        excerpt = _fmt(r.get("excerpt"), "")
-        image_url = _fmt(r.get("image_url"), "")
-        heat_text = _fmt(r.get("heat_text"))
-        hv_raw = r.get("heat_value")
-
-        # 热度数值 -> “万”
-        heat_display = heat_text
-        try:
-            hv = float(hv_raw)
-            heat_display = f"{hv/10000:.0f}万" if hv >= 10000 else f"{hv:.0f}"
-        except Exception:
-            pass
-
-        # 标题可点击
-        if url:
-            title_html = f'<a href="{url}" target="_blank" rel="noopener noreferrer">{title}</a>'
-        else:
-            title_html = title
-
-        # 左半部分
-        left_html = (
-            f'<div class="card-left">'
-            f'<div class="title">{title_html}</div>'
-            f'<div class="badges">'
-            f'<div class="badge">📌 {platform}</div>'
-            f'<div class="badge">🏷 排名 {rank}</div>'
-            f'<div class="badge">🔥 {heat_display}</div>'
-            f'<div class="badge">📅 {scraped_date}</div>'
-            f'<div class="badge">⏱ {scraped_at}</div>'
-            f'</div>'
-        )
-        if excerpt and excerpt != "—":
-            left_html += f'<div class="excerpt">{excerpt}</div>'
-        left_html += '</div>'
-
-        # 右半部分（图片可选）
-        if image_url and image_url != "—":
-            right_html = f'<div class="card-right"><img src="{image_url}" class="thumb"></div>'
-        else:
-            right_html = '<div class="card-right"></div>'
-
-        card_html = f'<div class="hot-card">{left_html}{right_html}</div>'
-        st.markdown(card_html, unsafe_allow_html=True)
-
-    st.markdown('</div>', unsafe_allow_html=True)
+    # 整页卡片拼成一段 HTML，一次 st.markdown 下发，而不是每张卡片一条消息
+    cards = [_card_html(r) for r in data]
+    st.markdown('<div class="card-grid">' + "".join(cards) + '</div>', unsafe_allow_html=True)
 
 
 render_cards(rows)
@@ -258,7 +383,7 @@ with c3:
     st.write(f"第 **{current_page} / {total_pages}** 页 · 每页 **{page_size}** 条 · 共 **{total}** 条")
 
 with c4:
-    if st.button("下一页 ›", use_container_width=True, disabled=(current_page >= total_pages)):
+    if st.button("下一页 ›", use_container_width=True, disabled=not has_next):
         st.session_state.page_num = current_page + 1
         st.rerun()
 
@@ -274,5 +399,3 @@ with c6:
         st.rerun()
 
 st.caption("💡 左侧可以选择平台（百度/微博/知乎/抖音），卡片右侧有图的会自动显示。")
-
-db.close()
\ No newline at end of file
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 """
 init_db.py
-用于初始化 SQLite 数据库 hot.db，创建表 hot_items_history 和必要索引。
+用于初始化 SQLite 数据库 hot.db，创建表 hot_items_history、必要索引以及全文索引 hot_items_fts。
 可重复执行（不会重复建表）。
 """
 
@@ -9,6 +9,8 @@ from __future__ import annotations
 import sqlite3
 from pathlib import Path
 
+from storage import PLAT_DATE_SCRAPED_INDEX_DDL, HotItemsHistoryDB
+
 DB_PATH = Path("hot.db")
 
 DDL = """
@@ -33,17 +35,31 @@ CREATE TABLE IF NOT EXISTS hot_items_history (
 
 INDEXES = [
     "CREATE INDEX IF NOT EXISTS idx_hot_hist_platform_date ON hot_items_history(platform, scraped_date);",
+    # 覆盖 app 的默认查询：platform IN (...) AND scraped_date 区间 + ORDER BY scraped_at DESC, id DESC
+    PLAT_DATE_SCRAPED_INDEX_DDL,
     "CREATE INDEX IF NOT EXISTS idx_hot_hist_date ON hot_items_history(scraped_date);",
-    "CREATE INDEX IF NOT EXISTS idx_hot_hist_heat_value ON hot_items_history(heat_value);",
-    "CREATE INDEX IF NOT EXISTS idx_hot_hist_rank ON hot_items_history(rank);",
+    # 排序列 + id，供 keyset 翻页做索引范围扫描
+    "CREATE INDEX IF NOT EXISTS idx_hot_hist_scraped_at ON hot_items_history(scraped_at, id);",
+    "CREATE INDEX IF NOT EXISTS idx_hot_hist_heat_value ON hot_items_history(heat_value, id);",
+    # app 提供按排名排序：没有它时 rank 排序每页都要全表扫描 + 临时排序，keyset 游标也无从利用
+    "CREATE INDEX IF NOT EXISTS idx_hot_hist_rank ON hot_items_history(rank, id);",
 ]
 
 def init_db(db_path: Path = DB_PATH) -> None:
     """初始化数据库"""
     conn = sqlite3.connect(db_path)
+    # WAL 模式持久化在数据库文件里，之后每次写入只追加 WAL，配合 NORMAL 同步大幅减少 fsync
+    conn.execute("PRAGMA journal_mode = WAL;")
+    conn.execute("PRAGMA synchronous = NORMAL;")
     conn.executescript(DDL)
     for idx_sql in INDEXES:
         conn.execute(idx_sql)
+    # 关键词检索用的全文索引（首次创建时为已有数据补建）
+    # trigram 分词需要 SQLite >= 3.34；版本过旧时跳过，查询自动回退为 LIKE
+    try:
+        HotItemsHistoryDB(conn=conn, apply_pragmas=False).ensure_fts()
+    except sqlite3.OperationalError as e:
+        print(f"⚠️ 未创建全文索引（SQLite {sqlite3.sqlite_version}）：{e}，关键词检索将使用 LIKE")
     conn.commit()
     conn.close()
     print(f"✅ 数据库初始化完成：{db_path.resolve()}")
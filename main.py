@@ -14,8 +14,12 @@
 """
 from __future__ import annotations
 import argparse
+import os
+import sqlite3
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from typing import Any
 
 from storage import HotItemsHistoryDB
 
@@ -34,6 +38,9 @@ SPIDER_REGISTRY = {
     "cailian": CailianHotSpider,
 }
 
+# 支持条件请求（ETag / Last-Modified）的平台；抖音、微博的 JSON 接口不认这些头
+CONDITIONAL_GET_PROVIDERS = {"baidu", "cailian"}
+
 
 def parse_args():
     p = argparse.ArgumentParser(description="抓取热榜并写入 SQLite")
@@ -52,64 +59,122 @@ def parse_args():
     return p.parse_args()
 
 
-def run_once(db_path: str, provider_names: list[str]):
+def build_spiders(db_path: str, provider_names: list[str]) -> dict[str, Any]:
+    """
+    按平台实例化爬虫。实例在 main() 中只建一次，多轮定时抓取复用同一个连接池（keep-alive 连接），
+    退出时由 close_spiders 关闭
+    """
+    # 条件请求的校验值放在数据库文件旁边
+    validator_path = os.path.join(os.path.dirname(os.path.abspath(db_path)), "http_validators.json")
+
+    spiders: dict[str, Any] = {}
+    for name in provider_names:
+        name = name.lower()
+        if name not in SPIDER_REGISTRY:
+            print(f"[skip] 不支持的平台：{name}")
+            continue
+        SpiderCls = SPIDER_REGISTRY[name]
+        try:
+            if name in CONDITIONAL_GET_PROVIDERS:
+                spiders[name] = SpiderCls(validator_path=validator_path)
+            else:
+                spiders[name] = SpiderCls()
+        except Exception as e:
+            # 如微博未配置 Cookie：跳过该平台，不影响其他平台
+            print(f"[{name}] 初始化失败：{e}")
+    return spiders
+
+
+def close_spiders(spiders: dict[str, Any]):
+    for spider in spiders.values():
+        spider.session.close()
+
+
+def run_once(db_path: str, spiders: dict[str, Any]):
     """
-    跑一轮：依次抓取各平台，写入 SQLite
+    跑一轮：并发抓取各平台（均为网络 IO，线程即可），再在一个事务里统一写入 SQLite
     """
     print(f"\n====== 执行抓取任务 @ {datetime.now():%Y-%m-%d %H:%M:%S} ======")
 
-    db = HotItemsHistoryDB(db_path=db_path)
+    try:
+        db = HotItemsHistoryDB(db_path=db_path)
+    except sqlite3.Error as e:
+        print(f"[db] 打开数据库失败，本轮跳过：{e}")
+        return
     total = 0
 
     try:
-        for name in provider_names:
-            name = name.lower()
-            if name not in SPIDER_REGISTRY:
-                print(f"[skip] 不支持的平台：{name}")
-                continue
-
-            SpiderCls = SPIDER_REGISTRY[name]
-            spider = SpiderCls()
-
-            print(f"[{name}] 开始抓取...")
-            try:
-                items = spider.run()
-            except Exception as e:
-                print(f"[{name}] 抓取异常：{e}")
-                continue
-
-            if not items:
-                print(f"[{name}] 无数据，可能被风控/需要 Cookie")
-                continue
-
-            # 不同平台的特殊字段
-            extra_fields: list[str] = []
-            topic_key_field: str | None = None
-
-            if name == "weibo":
-                topic_key_field = "word_scheme"
-                extra_fields = ["word_scheme"]
-            elif name == "douyin":
-                topic_key_field = "sentence_id"
-            elif name == "baidu":
-                extra_fields = ["avatar_url"]
-            elif name == "zhihu":
-                extra_fields = ["avatar_url"]
-            elif name == "cailian":
-                extra_fields = ["id", "ctime", "level", "comment_num"]
-
-            try:
-                inserted = db.upsert_history(
-                    platform=name,
-                    items=items,
-                    topic_key_field=topic_key_field,
-                    tags_join_from=None,
-                    extra_fields=extra_fields,
-                )
-                print(f"[{name}] upsert 成功：{inserted} 条")
-                total += inserted
-            except Exception as e:
-                print(f"[{name}] 入库失败：{e}")
+        fetched: list[tuple[str, list]] = []
+        with ThreadPoolExecutor(max_workers=max(1, len(spiders))) as ex:
+            futures = {}
+            for name, spider in spiders.items():
+                print(f"[{name}] 开始抓取...")
+                futures[ex.submit(spider.run)] = name
+
+            for fut in as_completed(futures):
+                name = futures[fut]
+                try:
+                    items = fut.result()
+                except Exception as e:
+                    print(f"[{name}] 抓取异常：{e}")
+                    continue
+
+                if not items:
+                    if getattr(spiders[name], "not_modified", False):
+                        print(f"[{name}] 内容未变化（304），本轮跳过")
+                    else:
+                        print(f"[{name}] 无数据，可能被风控/需要 Cookie")
+                    continue
+
+                fetched.append((name, items))
+
+        # 抓取全部结束后再写库：所有平台合并为一个事务、一次提交；连接不跨线程。
+        # 每个平台的 upsert 在事务内各占一个 SAVEPOINT，单个平台失败只回滚它自己的行
+        written: list[str] = []
+        try:
+            with db.bulk_transaction():
+                for name, items in fetched:
+                    # 不同平台的特殊字段
+                    extra_fields: list[str] = []
+                    topic_key_field: str | None = None
+
+                    if name == "weibo":
+                        topic_key_field = "word_scheme"
+                        extra_fields = ["word_scheme"]
+                    elif name == "douyin":
+                        topic_key_field = "sentence_id"
+                    elif name == "baidu":
+                        extra_fields = ["avatar_url"]
+                    elif name == "zhihu":
+                        extra_fields = ["avatar_url"]
+                    elif name == "cailian":
+                        extra_fields = ["id", "ctime", "level", "comment_num"]
+
+                    try:
+                        inserted = db.upsert_history(
+                            platform=name,
+                            items=items,
+                            topic_key_field=topic_key_field,
+                            tags_join_from=None,
+                            extra_fields=extra_fields,
+                        )
+                        print(f"[{name}] upsert 成功：{inserted} 条")
+                        total += inserted
+                        if inserted:
+                            written.append(name)
+                    except Exception as e:
+                        print(f"[{name}] 入库失败：{e}")
+        except sqlite3.Error as e:
+            # BEGIN / COMMIT 失败（如其他进程长时间持有写锁）：整轮未落库，下一轮照常抓取
+            print(f"[db] 本轮写入失败，已放弃：{e}")
+            total = 0
+            written = []
+
+        # 事务提交成功后才保存条件请求的校验值；入库失败的平台下次照常全量抓取
+        for name in written:
+            commit_validators = getattr(spiders[name], "commit_validators", None)
+            if commit_validators is not None:
+                commit_validators()
 
     finally:
         db.close()
@@ -122,16 +187,20 @@ def main():
     args = parse_args()
     providers = [p.strip() for p in args.providers.split(",") if p.strip()]
     interval = args.interval
+    spiders = build_spiders(args.db, providers)
 
     # 持续循环
-    while True:
-        start = time.time()
-        run_once(args.db, providers)
-        elapsed = time.time() - start
-        sleep_sec = max(0, interval - elapsed)
-        # 这里不能做异步，只是阻塞 sleep
-        print(f"[sleep] 将在 {sleep_sec/3600:.2f} 小时后再次抓取...\n")
-        time.sleep(sleep_sec)
+    try:
+        while True:
+            start = time.time()
+            run_once(args.db, spiders)
+            elapsed = time.time() - start
+            sleep_sec = max(0, interval - elapsed)
+            # 这里不能做异步，只是阻塞 sleep
+            print(f"[sleep] 将在 {sleep_sec/3600:.2f} 小时后再次抓取...\n")
+            time.sleep(sleep_sec)
+    finally:
+        close_spiders(spiders)
 
 
 if __name__ == "__main__":
@@ -1,11 +1,32 @@
 # scraper/baidu_spider.py
 # -*- coding: utf-8 -*-
 from __future__ import annotations
-import urllib.request
-import urllib.error
-from bs4 import BeautifulSoup
+import requests
+import lxml.html
+from lxml.cssselect import CSSSelector
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+
+from scraper.common import ValidatorStore, make_session
+
+# 选择器在模块加载时编译一次（CSS -> XPath），每条热搜复用
+_SEL_ITEM = CSSSelector("div.category-wrap_iQLoo")
+_SEL_RANK = CSSSelector("div.index_1Ew5p")
+_SEL_IMG = CSSSelector("a.img-wrapper_29V76 img, a.img-wrapper_ img")
+_SEL_TITLE = CSSSelector("div.c-single-text-ellipsis")
+_SEL_DESC = CSSSelector("div.hot-desc_1m_jR")
+_SEL_HOT = CSSSelector("div.hot-index_1Bl1a")
+_SEL_LINK = CSSSelector("a[href]")
+
+
+def _first(sel: CSSSelector, el):
+    found = sel(el)
+    return found[0] if found else None
+
+
+def _text(el) -> str:
+    # 与 bs4 的 get_text(strip=True) 一致：逐段去掉首尾空白后拼接
+    return "".join(s.strip() for s in el.itertext()) if el is not None else ""
 
 
 class BaiduHotSpider:
@@ -24,7 +45,14 @@ class BaiduHotSpider:
       }
     """
 
-    def __init__(self) -> None:
+    # 响应体读取上限：热榜列表位于页面前部，超出部分直接丢弃，限制内存占用
+    MAX_HTML_BYTES = 1024 * 1024
+
+    def __init__(
+        self,
+        session: Optional[requests.Session] = None,
+        validator_path: Optional[str] = None,
+    ) -> None:
         self.url = "https://top.baidu.com/board?tab=realtime"
         self.headers = {
             "User-Agent": (
@@ -33,55 +61,82 @@ class BaiduHotSpider:
                 "Chrome/122.0.0.0 Safari/537.36"
             )
         }
-
-    def fetch_html(self) -> str:
-        req = urllib.request.Request(self.url, headers=self.headers)
+        self.session = session or make_session()
+        # 提供路径时启用条件请求（ETag / Last-Modified）
+        self.validators = ValidatorStore(validator_path) if validator_path else None
+        # 上一次 run() 的状态：是否 304、待保存的校验值（见 commit_validators）
+        self.not_modified = False
+        self.pending_validators: Optional[Dict[str, Optional[str]]] = None
+
+    def fetch_html(self) -> tuple[bytes, str, Optional[Dict[str, Optional[str]]]]:
+        """
+        流式读取页面，最多 MAX_HTML_BYTES 字节；直接返回 bytes 与其编码，
+        交给 lxml 按该编码解码，省去 Python 层的 decode。
+        同时返回本次响应的校验值（未启用条件请求时为 None），由调用方决定是否保存
+        """
+        self.not_modified = False
+        headers = dict(self.headers)
+        if self.validators:
+            headers.update(self.validators.headers_for(self.url))
+
+        buf = bytearray()
         try:
-            resp = urllib.request.urlopen(req, timeout=10)
-            return resp.read().decode("utf-8", errors="ignore")
-        except urllib.error.URLError as e:
+            with self.session.get(self.url, headers=headers, timeout=10, stream=True) as resp:
+                if resp.status_code == 304:
+                    self.not_modified = True
+                    return b"", "utf-8", None
+                resp.raise_for_status()
+                # 只认 Content-Type 里明确声明的 charset；未声明时 requests 会按 HTTP 规范
+                # 猜成 ISO-8859-1，而百度页面实际是 UTF-8
+                content_type = resp.headers.get("Content-Type", "").lower()
+                encoding = (resp.encoding if "charset=" in content_type else None) or "utf-8"
+                for chunk in resp.iter_content(chunk_size=64 * 1024):
+                    buf += chunk
+                    if len(buf) >= self.MAX_HTML_BYTES:
+                        break
+                validators = ValidatorStore.extract(resp) if self.validators else None
+        except requests.RequestException as e:
             print(f"❌ 请求失败: {e}")
-            return ""
-
-    def parse(self, html: str) -> List[Dict[str, Any]]:
-        soup = BeautifulSoup(html, "html.parser")
+            return b"", "utf-8", None
+        return bytes(buf[: self.MAX_HTML_BYTES]), encoding, validators
+
+    def parse(self, html: str | bytes, encoding: str = "utf-8") -> List[Dict[str, Any]]:
+        # libxml2 解析，比 bs4 + html.parser 快一个数量级；bytes 输入时显式指定编码，
+        # 不依赖页面里是否有 <meta charset>（没有时 libxml2 会按 latin-1 解码）
+        if isinstance(html, bytes):
+            tree = lxml.html.fromstring(html, parser=lxml.html.HTMLParser(encoding=encoding))
+        else:
+            tree = lxml.html.fromstring(html)
         results: List[Dict[str, Any]] = []
         now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-        items = soup.find_all("div", class_="category-wrap_iQLoo")
+        items = _SEL_ITEM(tree)
         for i, item in enumerate(items, 1):
             # 排名
-            rank_div = item.find("div", class_="index_1Ew5p")
-            rank = rank_div.get_text(strip=True) if rank_div else str(i)
+            rank_div = _first(_SEL_RANK, item)
+            rank = _text(rank_div) if rank_div is not None else str(i)
 
             # 封面图
             image_url = ""
-            img_wrap = item.find("a", class_="img-wrapper_29V76") or item.find("a", class_="img-wrapper_")
-            if img_wrap:
-                img_tag = img_wrap.find("img")
-                if img_tag and img_tag.get("src"):
-                    src = img_tag["src"]
-                    image_url = "https:" + src if src.startswith("//") else src
+            img_tag = _first(_SEL_IMG, item)
+            src = img_tag.get("src") if img_tag is not None else None
+            if src:
+                image_url = "https:" + src if src.startswith("//") else src
 
             # 标题
-            title_div = item.find("div", class_="c-single-text-ellipsis")
-            title = title_div.get_text(strip=True) if title_div else ""
+            title = _text(_first(_SEL_TITLE, item))
 
             # 描述
-            desc_div = item.find("div", class_="hot-desc_1m_jR")
-            desc = ""
-            if desc_div:
-                desc = desc_div.get_text(strip=True).replace("查看更多>", "").strip()
+            desc = _text(_first(_SEL_DESC, item)).replace("查看更多>", "").strip()
 
             # 热度
-            hot_div = item.find("div", class_="hot-index_1Bl1a")
-            heat_text = hot_div.get_text(strip=True) if hot_div else ""
+            heat_text = _text(_first(_SEL_HOT, item))
 
             # 链接
             url = ""
-            link_tag = item.find("a", href=True)
-            if link_tag:
-                href = link_tag["href"]
+            link_tag = _first(_SEL_LINK, item)
+            if link_tag is not None:
+                href = link_tag.get("href")
                 url = href if href.startswith("http") else "https://www.baidu.com" + href
 
             results.append(
@@ -99,8 +154,17 @@ class BaiduHotSpider:
         return results
 
     def run(self) -> List[Dict[str, Any]]:
-        html = self.fetch_html()
-        return self.parse(html) if html else []
+        html, encoding, validators = self.fetch_html()
+        items = self.parse(html, encoding) if html else []
+        # 解析出条目才考虑保存校验值（风控页同样是 200，但解析不出内容）
+        self.pending_validators = validators if items else None
+        return items
+
+    def commit_validators(self) -> None:
+        """本轮数据入库成功后调用：保存校验值，当天后续抓取才会发条件请求"""
+        if self.validators and self.pending_validators is not None:
+            self.validators.save(self.url, self.pending_validators)
+        self.pending_validators = None
 
 
 if __name__ == "__main__":
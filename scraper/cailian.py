@@ -3,7 +3,9 @@
 from __future__ import annotations
 import requests
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+
+from scraper.common import ValidatorStore, loads, make_session
 
 
 class CailianHotSpider:
@@ -29,7 +31,11 @@ class CailianHotSpider:
       }
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        session: Optional[requests.Session] = None,
+        validator_path: Optional[str] = None,
+    ):
         self.url = "https://www.cls.cn/nodeapi/telegraphList?"
         self.headers = {
             "authority": "www.cls.cn",
@@ -42,21 +48,38 @@ class CailianHotSpider:
                 "Chrome/131.0.6778.86 Safari/537.36"
             ),
         }
+        # 复用连接，定时抓取时省去每次的 TLS 握手
+        self.session = session or make_session()
+        # 提供路径时启用条件请求（ETag / Last-Modified）
+        self.validators = ValidatorStore(validator_path) if validator_path else None
+        # 上一次 run() 的状态：是否 304、待保存的校验值（见 commit_validators）
+        self.not_modified = False
+        self.pending_validators: Optional[Dict[str, Optional[str]]] = None
 
     # ----------------------------
     def fetch_page(self):
+        """返回 (电报列表, 本次响应的校验值)；校验值未启用或响应无效时为 None，由调用方决定是否保存"""
+        self.not_modified = False
+        headers = dict(self.headers)
+        if self.validators:
+            headers.update(self.validators.headers_for(self.url))
+
         try:
-            resp = requests.get(self.url, headers=self.headers, timeout=10)
-            data = resp.json()
+            resp = self.session.get(self.url, headers=headers, timeout=10)
+            if resp.status_code == 304:
+                self.not_modified = True
+                return [], None
+            data = loads(resp.content)
         except Exception as e:
             print("❌ 财联社请求失败:", e)
-            return []
+            return [], None
 
         if data.get("error") != 0:
             print("❌ 财联社返回错误:", data)
-            return []
+            return [], None
 
-        return data.get("data", {}).get("roll_data", [])
+        validators = ValidatorStore.extract(resp) if self.validators else None
+        return data.get("data", {}).get("roll_data", []), validators
 
     # ----------------------------
     def normalize(self, it: Dict[str, Any], scraped_at: str) -> Dict[str, Any]:
@@ -94,9 +117,17 @@ class CailianHotSpider:
 
     # ----------------------------
     def run(self) -> List[Dict[str, Any]]:
-        raw_items = self.fetch_page()
+        raw_items, validators = self.fetch_page()
         scraped_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        return [self.normalize(it, scraped_at) for it in raw_items]
+        items = [self.normalize(it, scraped_at) for it in raw_items]
+        self.pending_validators = validators if items else None
+        return items
+
+    def commit_validators(self) -> None:
+        """本轮数据入库成功后调用：保存校验值，当天后续抓取才会发条件请求"""
+        if self.validators and self.pending_validators is not None:
+            self.validators.save(self.url, self.pending_validators)
+        self.pending_validators = None
 
 
 if __name__ == "__main__":
@@ -0,0 +1,141 @@
+# scraper/common.py
+# -*- coding: utf-8 -*-
+"""
+各平台爬虫共用的 HTTP 工具。
+"""
+from __future__ import annotations
+import asyncio
+import json
+import os
+import threading
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:  # 可选依赖：orjson 解析更快，且可直接吃 bytes
+    import orjson
+except ImportError:
+    orjson = None
+
+try:  # 可选依赖：仅 scrape_all 需要
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+def make_session(
+    headers: Optional[Dict[str, str]] = None,
+    *,
+    pool_connections: int = 10,
+    pool_maxsize: int = 10,
+    retries: int = 2,
+    backoff_factor: float = 0.3,
+    status_forcelist: Sequence[int] = (500, 502, 503, 504),
+) -> requests.Session:
+    """
+    创建带连接池与重试的 Session：
+    - keep-alive 复用同一主机的 TCP/TLS 连接，省去每次请求的握手
+    - 瞬时的 5xx / 连接超时自动重试，避免一次抖动让整轮抓取落空
+    """
+    session = requests.Session()
+    if headers:
+        session.headers.update(headers)
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=tuple(status_forcelist),
+        ),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def loads(data: bytes) -> Any:
+    """解析响应体 JSON；装了 orjson 则用 orjson，否则回退标准库"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class ValidatorStore:
+    """
+    把各 URL 最近一次响应的 ETag / Last-Modified 保存到一个 json 文件，用于条件请求：
+    页面未变化时服务端返回 304 空响应，省下下载和解析。
+
+    校验值只在记录当天有效——跨天后无论页面是否变化都重新抓取，保证每天都有一份快照。
+    爬虫取到响应时只用 extract 提取校验值，等本轮数据解析出条目并成功入库后再 save；
+    否则（风控页、入库失败）当天后续抓取都会拿到 304，丢掉当天的快照。
+    """
+
+    # 多个爬虫可能在不同线程里读写同一个文件
+    _lock = threading.Lock()
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def headers_for(self, url: str) -> Dict[str, str]:
+        with self._lock:
+            entry = self._load().get(url)
+        if not entry or entry.get("date") != date.today().isoformat():
+            return {}
+        headers: Dict[str, str] = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    @staticmethod
+    def extract(resp: requests.Response) -> Dict[str, Optional[str]]:
+        """取出响应里的校验值；服务端都没给时返回空 dict（save 时会清掉旧记录）"""
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+        if not (etag or last_modified):
+            return {}
+        return {"etag": etag, "last_modified": last_modified}
+
+    def save(self, url: str, validators: Dict[str, Optional[str]]) -> None:
+        with self._lock:
+            data = self._load()
+            if validators:
+                data[url] = {**validators, "date": date.today().isoformat()}
+            elif data.pop(url, None) is None:
+                return
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp, self.path)
+
+
+async def scrape_all(spiders: Sequence[Any]) -> List[Any]:
+    """
+    在一个事件循环里并发运行多个爬虫，总耗时约等于最慢的那个：
+    - 实现了 arun(session) 的爬虫共用一个 aiohttp 连接池
+    - 其余同步爬虫放到线程池里执行 run()
+    返回结果与 spiders 顺序一致；单个爬虫失败时对应位置是异常对象，不影响其他平台。
+    """
+    if aiohttp is None:
+        raise RuntimeError("scrape_all 需要安装 aiohttp：pip install aiohttp")
+
+    connector = aiohttp.TCPConnector(limit=32, limit_per_host=8, ttl_dns_cache=300)
+    # trust_env：与 requests 一致，读取 HTTPS_PROXY / HTTP_PROXY
+    async with aiohttp.ClientSession(connector=connector, trust_env=True) as session:
+        jobs = [
+            s.arun(session) if hasattr(s, "arun") else asyncio.to_thread(s.run)
+            for s in spiders
+        ]
+        return await asyncio.gather(*jobs, return_exceptions=True)
@@ -3,12 +3,15 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 import os
+from operator import itemgetter
 from typing import Any, Dict, List, Optional
 from urllib.parse import quote
 from datetime import datetime
 
 import requests
 
+from scraper.common import loads, make_session
+
 
 class DouyinHotSpider:
     """
@@ -25,6 +28,7 @@ class DouyinHotSpider:
         url: Optional[str] = None,
         ua: Optional[str] = None,
         cookie: Optional[str] = None,
+        session: Optional[requests.Session] = None,
     ) -> None:
         # 支持从外面传，也支持读环境变量
         self.url = url or os.getenv(
@@ -36,6 +40,7 @@ class DouyinHotSpider:
             "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/18.6 Safari/605.1.15",
         )
         self.cookie = cookie or os.getenv("DOUYIN_COOKIE", "")
+        self.session = session or make_session()
 
     # ---------- 内部工具 ----------
     def _headers(self) -> Dict[str, str]:
@@ -62,14 +67,14 @@ class DouyinHotSpider:
     # ---------- 核心步骤：请求 + 解析 ----------
     def fetch_json(self) -> Dict[str, Any]:
         """请求接口，拿到原始 JSON"""
-        resp = requests.get(
+        resp = self.session.get(
             self.url,
             headers=self._headers(),
             timeout=20,
             proxies=self._proxies(),
         )
         resp.raise_for_status()
-        return resp.json()
+        return loads(resp.content)
 
     def parse_items(self, payload: Dict[str, Any]) -> List[Dict[str, Any]]:
         """从 JSON 里抽出我们要的字段"""
@@ -85,7 +90,11 @@ class DouyinHotSpider:
             if not (word and sentence_id):
                 continue
 
-            hot_value = item.get("hot_value")
+            # 入列表时就转成 int，排序键可以直接取值
+            try:
+                hot_value = int(item.get("hot_value") or 0)
+            except (TypeError, ValueError):
+                hot_value = 0
             items.append(
                 {
                     "title": str(word),
@@ -97,7 +106,7 @@ class DouyinHotSpider:
             )
 
         # 按热度从高到低
-        items.sort(key=lambda x: (x.get("heat_value") or 0), reverse=True)
+        items.sort(key=itemgetter("heat_value"), reverse=True)
         return items
 
     # ---------- 对外入口 ----------
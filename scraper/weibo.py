@@ -20,6 +20,12 @@ from typing import List, Dict, Any, Optional
 from urllib.parse import quote
 import requests
 
+from scraper.common import loads, make_session
+
+# 预编译：热度 “12.3万” / “1.2亿” / “45678”，以及 Cookie 中的 XSRF-TOKEN
+_HEAT_RE = re.compile(r"^\s*([\d.]+)\s*([万亿])?\s*$")
+_XSRF_RE = re.compile(r"\bXSRF-TOKEN=([^;]+)")
+
 
 # ✅ 直接在这里填写 Cookie 常量（复制自浏览器）
 WEIBO_COOKIE = (
@@ -45,7 +51,9 @@ class WeiboHotSpider:
         if not WEIBO_COOKIE.strip():
             raise RuntimeError("❌ 请先在 weibo_spider.py 顶部填写 WEIBO_COOKIE 常量！")
         self.cookie = WEIBO_COOKIE.strip()
-        self.session = session or requests.Session()
+        # Cookie 在爬虫生命周期内不变，token 只解析一次
+        self.xsrf_token = self._extract_xsrf_token(self.cookie)
+        self.session = session or make_session()
 
     # ========= 工具函数 =========
     @staticmethod
@@ -56,7 +64,7 @@ class WeiboHotSpider:
         if not s:
             return None
 
-        m = re.match(r"^\s*([\d\.]+)\s*(万|亿)?\s*$", s)
+        m = _HEAT_RE.match(s)
         if not m:
             try:
                 return int(float(s))
@@ -79,11 +87,11 @@ class WeiboHotSpider:
 
     @staticmethod
     def _extract_xsrf_token(cookie: str) -> Optional[str]:
-        m = re.search(r"\bXSRF-TOKEN=([^;]+)", cookie)
+        m = _XSRF_RE.search(cookie)
         return m.group(1) if m else None
 
     def _headers(self) -> Dict[str, str]:
-        xsrf = self._extract_xsrf_token(self.cookie)
+        xsrf = self.xsrf_token
         h = {
             "User-Agent": self.UA,
             "Accept": "application/json, text/plain, */*",
@@ -105,7 +113,7 @@ class WeiboHotSpider:
         if r.status_code == 403:
             raise RuntimeError("403 Forbidden：Cookie 或 XSRF 头无效/过期。请从浏览器重新复制 Cookie。")
         r.raise_for_status()
-        return r.json()
+        return loads(r.content)
 
     def parse_items(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
         realtime = (data or {}).get("data", {}).get("realtime", []) or []
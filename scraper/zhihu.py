@@ -1,11 +1,43 @@
 # zhihu_scraper.py
 # -*- coding: utf-8 -*-
 from __future__ import annotations
+import asyncio
+import re
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Any, Dict, List, Optional
 
 import requests
 
+from scraper.common import loads, make_session
+
+try:  # 可选依赖：仅 afetch_json / arun 异步接口需要
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+try:  # 可选依赖：装了 httpx[http2] 时走 HTTP/2，多次定时抓取之间复用同一条连接
+    import httpx
+    import h2  # noqa: F401  (httpx 的 http2=True 依赖 h2)
+except ImportError:
+    httpx = None
+
+try:  # 可选依赖：有 brotli 解码器时请求 br 压缩（JSON 比 gzip 更小），requests / httpx 都会自动解压
+    import brotli  # noqa: F401
+    _HAS_BROTLI = True
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        _HAS_BROTLI = True
+    except ImportError:
+        _HAS_BROTLI = False
+
+# 热度文本中的数值部分，如 “1234.5 万热度” 里的 1234.5
+_NUM_RE = re.compile(r"\d+(?:\.\d+)?")
+# 接口返回的 api 问题链接 -> 网页链接：只改子域名与路径前缀
+_URL_REWRITE = re.compile(r"^(https?://)api(\.zhihu\.com/)questions(/)")
+_URL_REPL = r"\1www\2question\3"
+
 
 class ZhihuHotSpider:
     """
@@ -14,6 +46,10 @@ class ZhihuHotSpider:
     使用示例:
         spider = ZhihuHotSpider()
         items = spider.run()
+
+        # 或者用 with，结束时关闭连接池
+        with ZhihuHotSpider() as spider:
+            items = spider.run()
     返回的每条 item:
         {
           "rank": 1,
@@ -27,7 +63,7 @@ class ZhihuHotSpider:
         }
     """
 
-    def __init__(self, limit: int = 50) -> None:
+    def __init__(self, limit: int = 50, session: Optional[requests.Session | httpx.Client] = None) -> None:
         self.limit = limit
         # 两个 API 都保留，一条挂了换另一条
         self.candidate_endpoints = [
@@ -41,6 +77,45 @@ class ZhihuHotSpider:
                 "AppleWebKit/605.1.15 (KHTML, like Gecko) Mobile/15E148"
             )
         }
+        if _HAS_BROTLI:
+            self.headers["Accept-Encoding"] = "br, gzip"
+        # 两个候选接口、多次定时抓取之间复用同一个连接池；装了 httpx[http2] 时优先用 HTTP/2
+        if session is not None:
+            self.session = session
+        elif httpx is not None:
+            # httpx 只对连接失败重试，不像 make_session 那样按 5xx 状态码重试（另一条候选接口兜底）
+            self.session = httpx.Client(
+                headers=self.headers,
+                transport=httpx.HTTPTransport(
+                    http2=True,
+                    retries=2,
+                    limits=httpx.Limits(max_connections=8, max_keepalive_connections=4),
+                ),
+            )
+        else:
+            self.session = make_session(
+                self.headers,
+                pool_connections=4,
+                pool_maxsize=8,
+                status_forcelist=(502, 503, 504),
+            )
+        # 连接超时与读取超时（秒）；同步客户端与 aiohttp 的超时对象都由这两个值构造
+        self._connect_timeout = 3.0
+        self._read_timeout = 12.0
+        if httpx is not None and isinstance(self.session, httpx.Client):
+            self.timeout = httpx.Timeout(self._read_timeout, connect=self._connect_timeout)
+        else:
+            self.timeout = (self._connect_timeout, self._read_timeout)
+
+    # ===== 生命周期 =====
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self) -> "ZhihuHotSpider":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
 
     # ===== 工具 =====
     @staticmethod
@@ -55,69 +130,79 @@ class ZhihuHotSpider:
         """
         if not detail_text:
             return None
-        s = detail_text.replace(",", "").replace(" ", "")
-        num = ""
-        for ch in s:
-            if ch.isdigit() or ch == ".":
-                num += ch
-        if not num:
+        s = detail_text.replace(",", "")
+        m = _NUM_RE.search(s)
+        if not m:
             return None
-        val = float(num)
+        val = float(m.group())
+        has_wan = "万" in s
         # 如果原文不含“万”，按数量除以10000再加“万”
-        if "万" not in s:
+        if not has_wan:
             val = val / 10000
         return f"{val:.2f} 万"
 
     # ===== 核心步骤 =====
+    def _get_json(self, url: str, params: Dict[str, str]) -> Dict[str, Any]:
+        resp = self.session.get(url, headers=self.headers, params=params, timeout=self.timeout)
+        resp.raise_for_status()
+        return loads(resp.content)
+
     def fetch_json(self) -> Dict[str, Any] | None:
         """
-        轮询两个知乎热榜接口，返回第一个成功的 json
+        同时请求两个知乎热榜接口，返回最先成功的 json；
+        主接口卡住时不必等它超时后才去试备用接口
         """
-        for url, params in self.candidate_endpoints:
-            try:
-                resp = requests.get(url, headers=self.headers, params=params, timeout=12)
-                resp.raise_for_status()
-                return resp.json()
-            except Exception:
-                continue
-        return None
+        ex = ThreadPoolExecutor(max_workers=len(self.candidate_endpoints))
+        try:
+            futures = [ex.submit(self._get_json, url, params) for url, params in self.candidate_endpoints]
+            for fut in as_completed(futures):
+                try:
+                    return fut.result()
+                except Exception:
+                    continue
+            return None
+        finally:
+            # 不等落后的请求，它会在后台自行结束
+            ex.shutdown(wait=False, cancel_futures=True)
 
     def parse_items(self, js: Dict[str, Any]) -> List[Dict[str, Any]]:
         data = js.get("data", [])
         now = self._now()
         items: List[Dict[str, Any]] = []
 
-        for rank, item in enumerate(data, start=1):
-            if not isinstance(item, dict):
-                continue
+        # 逐条调用的辅助函数绑定为局部变量（正则替换与数字提取本身已在 C 层完成）
+        items_append = items.append
+        parse_heat = self._parse_heat_to_wan
+        rewrite_url = _URL_REWRITE.sub
 
+        for rank, item in enumerate(data, start=1):
+            # 解析结果本就是 dict，直接按 dict 取值；遇到非 dict 的异常条目再跳过
             # 有的在 item["target"] 里，有的直接在 item 里
-            target = item.get("target")
-            if not isinstance(target, dict):
-                target = item
-
-            title = target.get("title")
+            try:
+                target = item.get("target") or item
+                title = target.get("title")
+            except AttributeError:
+                continue
             if not title:
                 continue
 
-            answer_count = target.get("answer_count")
-            follower_count = target.get("follower_count")
-            excerpt = target.get("excerpt")
+            g = target.get
+            answer_count, follower_count, excerpt = g("answer_count"), g("follower_count"), g("excerpt")
 
             # question url 处理
-            raw_url = target.get("url") or ""
+            raw_url = g("url") or ""
             if raw_url:
-                # api -> www
-                question_url = raw_url.replace("api", "www").replace("questions", "question")
+                # api.zhihu.com/questions/xxx -> www.zhihu.com/question/xxx
+                question_url = rewrite_url(_URL_REPL, raw_url, count=1)
             else:
-                qid = target.get("id")
+                qid = g("id")
                 question_url = f"https://www.zhihu.com/question/{qid}" if qid else None
 
             # 热度
             heat_text_raw = item.get("detail_text") or item.get("detail_texts") or ""
-            heat_text = self._parse_heat_to_wan(str(heat_text_raw))
+            heat_text = parse_heat(str(heat_text_raw))
 
-            items.append(
+            items_append(
                 {
                     "rank": rank,
                     "title": title,
@@ -132,9 +217,38 @@ class ZhihuHotSpider:
 
         return items
 
+    # ===== 异步版本（需 aiohttp） =====
+    async def _aget_json(self, session: "aiohttp.ClientSession", url: str, params: Dict[str, str]) -> Dict[str, Any]:
+        timeout = aiohttp.ClientTimeout(sock_connect=self._connect_timeout, total=self._read_timeout)
+        async with session.get(url, headers=self.headers, params=params, timeout=timeout) as resp:
+            resp.raise_for_status()
+            return loads(await resp.read())
+
+    async def afetch_json(self, session: "aiohttp.ClientSession") -> Dict[str, Any] | None:
+        """
+        fetch_json 的异步版本：同时请求两个接口，返回最先成功的 json，其余请求取消
+        """
+        pending = {
+            asyncio.create_task(self._aget_json(session, url, params))
+            for url, params in self.candidate_endpoints
+        }
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, timeout=self._read_timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    break
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+            return None
+        finally:
+            for task in pending:
+                task.cancel()
+
     # ===== 对外 =====
-    def run(self) -> List[Dict[str, Any]]:
-        js = self.fetch_json()
+    def _finish(self, js: Dict[str, Any] | None) -> List[Dict[str, Any]]:
         if js is None:
             print("[zhihu] 抓取失败，返回空列表")
             return []
@@ -144,6 +258,13 @@ class ZhihuHotSpider:
             items = items[: self.limit]
         return items
 
+    def run(self) -> List[Dict[str, Any]]:
+        return self._finish(self.fetch_json())
+
+    async def arun(self, session: "aiohttp.ClientSession") -> List[Dict[str, Any]]:
+        """异步入口，session 由调用方提供（见 scraper.common.scrape_all）"""
+        return self._finish(await self.afetch_json(session))
+
 
 # quick test
 if __name__ == "__main__":
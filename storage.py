@@ -2,17 +2,170 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
-from typing import Iterable, Mapping, Any, Optional, Sequence
+from typing import Iterable, Iterator, Mapping, Any, Optional, Sequence
+from concurrent.futures import Future
+from contextlib import contextmanager
+from itertools import chain
 from datetime import datetime
 import sqlite3
 import json
+import queue
+import sys
+import threading
+
+try:  # 可选依赖：orjson 序列化更快，默认即输出 UTF-8 原文（等价于 ensure_ascii=False）
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# SQLite LIKE 的转义表（配合 ESCAPE '\'）：一次 translate 完成
+_LIKE_TRANS = str.maketrans({"\\": "\\\\", "%": "\\%", "_": "\\_"})
+
+
+def _dumps(obj: Any) -> str:
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, ensure_ascii=False)
+
+
+# 写入语句放在模块级：每次调用都是同一个字符串对象，稳定命中连接上的预编译语句缓存
+_UPSERT_SQL = """
+INSERT INTO hot_items_history
+  (platform, topic_key, title, url, image_url, excerpt,
+   heat_text, heat_value, rank, tags_text, scraped_at, scraped_date, extra_json)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(platform, url, scraped_date) DO UPDATE SET
+  topic_key=excluded.topic_key,
+  title=excluded.title,
+  image_url=excluded.image_url,
+  excerpt=excluded.excerpt,
+  heat_text=excluded.heat_text,
+  heat_value=excluded.heat_value,
+  rank=excluded.rank,
+  tags_text=excluded.tags_text,
+  scraped_at=excluded.scraped_at,
+  extra_json=excluded.extra_json
+"""
+
+
+# 标题 / 摘要 / 链接的全文索引（外部内容表，不重复存储正文）。
+# 中文标题没有空格分词，unicode61 会把整段汉字当成一个词，因此用 trigram 做子串匹配（SQLite >= 3.34）。
+_FTS_DDL = """
+CREATE VIRTUAL TABLE IF NOT EXISTS hot_items_fts USING fts5(
+    title, excerpt, url,
+    content='hot_items_history', content_rowid='id', tokenize='trigram'
+);
+
+CREATE TRIGGER IF NOT EXISTS hot_items_fts_ai AFTER INSERT ON hot_items_history BEGIN
+    INSERT INTO hot_items_fts(rowid, title, excerpt, url)
+    VALUES (new.id, new.title, new.excerpt, new.url);
+END;
+
+CREATE TRIGGER IF NOT EXISTS hot_items_fts_ad AFTER DELETE ON hot_items_history BEGIN
+    INSERT INTO hot_items_fts(hot_items_fts, rowid, title, excerpt, url)
+    VALUES ('delete', old.id, old.title, old.excerpt, old.url);
+END;
+
+CREATE TRIGGER IF NOT EXISTS hot_items_fts_au AFTER UPDATE ON hot_items_history BEGIN
+    INSERT INTO hot_items_fts(hot_items_fts, rowid, title, excerpt, url)
+    VALUES ('delete', old.id, old.title, old.excerpt, old.url);
+    INSERT INTO hot_items_fts(rowid, title, excerpt, url)
+    VALUES (new.id, new.title, new.excerpt, new.url);
+END;
+"""
+
+
+# (platform, scraped_date, scraped_at) 复合索引：init_db.py 建库时创建，
+# create_recommended_indexes 也会补建；两处共用这一份定义。
+# 按升序建并带上 id：倒序扫描即得到 ORDER BY scraped_at DESC, id DESC，无需再排序
+PLAT_DATE_SCRAPED_INDEX_DDL = (
+    "CREATE INDEX IF NOT EXISTS idx_hot_hist_plat_date_scraped "
+    "ON hot_items_history(platform, scraped_date, scraped_at, id);"
+)
+
+
+# 可能为 NULL 的排序列，keyset 翻页时需单独处理 NULL 段
+_NULLABLE_ORDER_COLS = {"heat_value", "rank"}
+
+
+def _seek_sql(order_by: str, key_is_null: bool) -> str:
+    """
+    生成 keyset 翻页条件：取排序上位于 (:after_key, :after_id) 之后的行，id 作为并列时的决胜键。
+    SQLite 中 NULL 视为最小值：ASC 时排在最前，DESC 时排在最后。
+    """
+    col, direction = order_by.split()
+    op = "<" if direction == "DESC" else ">"
+    if col == "id":
+        return f" AND id {op} :after_id"
+    if col not in _NULLABLE_ORDER_COLS:
+        return f" AND ({col}, id) {op} (:after_key, :after_id)"
+    if key_is_null:
+        if direction == "DESC":
+            return f" AND {col} IS NULL AND id < :after_id"
+        return f" AND (({col} IS NULL AND id > :after_id) OR {col} IS NOT NULL)"
+    if direction == "DESC":
+        return f" AND (({col}, id) < (:after_key, :after_id) OR {col} IS NULL)"
+    return f" AND ({col}, id) > (:after_key, :after_id)"
+
+
+class _WriterThread(threading.Thread):
+    """
+    独占一个写连接的后台线程：按入队顺序逐批写入，每批一个事务，结果（写入条数或异常）回填到 Future。
+    入队 None 表示退出。
+    """
+
+    def __init__(self, db_path: str) -> None:
+        super().__init__(name="hot-items-writer", daemon=True)
+        self.db_path = db_path
+        self.q: queue.Queue[Optional[tuple[list[tuple[Any, ...]], Future]]] = queue.Queue()
+
+    def run(self) -> None:
+        conn = None
+        error: Optional[BaseException] = None
+        try:
+            conn = sqlite3.connect(self.db_path, cached_statements=256, isolation_level=None)
+            conn.execute("PRAGMA journal_mode = WAL;")
+            conn.execute("PRAGMA synchronous = NORMAL;")
+        except sqlite3.Error as e:
+            error = e  # 连接失败时后续每个批次都以该异常结束，避免调用方永久等待
+
+        try:
+            while True:
+                job = self.q.get()
+                if job is None:
+                    break
+                rows, fut = job
+                if not fut.set_running_or_notify_cancel():
+                    continue
+                if error is not None:
+                    fut.set_exception(error)
+                    continue
+                try:
+                    conn.execute("BEGIN IMMEDIATE;")
+                    try:
+                        conn.executemany(_UPSERT_SQL, rows)
+                    except BaseException:
+                        conn.rollback()
+                        raise
+                    conn.commit()
+                except Exception as e:
+                    fut.set_exception(e)
+                else:
+                    fut.set_result(len(rows))
+        finally:
+            if conn is not None:
+                conn.close()
 
 
 class HotItemsHistoryDB:
     """
-    仅负责对既有表 hot_items_history 的 CRUD 操作（不创建表）。
+    负责对既有表 hot_items_history 的 CRUD 操作（主表由 init_db.py 创建）。
     - db_path 与 conn 任选其一；若都提供则优先使用 conn。
     - 自动开启事务批量写入；ON CONFLICT 覆盖更新同一天同链接的数据。
+    - 多次写入可用 bulk_transaction() 合并为一个事务。
+    - 不希望写入阻塞调用线程（如事件循环）时用 upsert_history_async()，由后台写线程落库。
+    - 可选：ensure_fts() 建立关键词全文索引，create_recommended_indexes() 建立推荐索引。
     """
 
     # 允许的排序白名单，防注入
@@ -23,14 +176,37 @@ class HotItemsHistoryDB:
         "rank ASC", "rank DESC",
         "id DESC", "id ASC",
     }
+    # 每种排序预先生成 keyset 条件与带 id 决胜键的 ORDER BY，查询时直接查表
+    _SEEK_CLAUSES = {
+        (order, key_is_null): _seek_sql(order, key_is_null)
+        for order in _ALLOWED_ORDERS for key_is_null in (False, True)
+    }
+    _ORDER_SQL = {
+        order: order if order.startswith("id ") else f"{order}, id {order.split()[1]}"
+        for order in _ALLOWED_ORDERS
+    }
+    # trigram 分词下少于 3 个字符的关键词无法用 FTS 匹配，回退 LIKE
+    _FTS_MIN_CHARS = 3
+    # 可选的推荐索引（见 create_recommended_indexes）
+    # 热度索引按升序建并带上 id：倒序扫描即得到 ORDER BY heat_value DESC, id DESC，无需再排序
+    _HEAT_INDEX = "idx_hot_hist_plat_date_heat_id"
+    _RECOMMENDED_INDEXES = {
+        _HEAT_INDEX:
+            "CREATE INDEX IF NOT EXISTS idx_hot_hist_plat_date_heat_id "
+            "ON hot_items_history(platform, scraped_date, heat_value, id);",
+        "idx_hot_hist_plat_date_scraped": PLAT_DATE_SCRAPED_INDEX_DDL,
+    }
+    # 数据库文件小于该值时不启用 mmap（页缓存足够，映射反而浪费虚拟内存）
+    _MMAP_MIN_DB_BYTES = 10 * 1024 * 1024
 
     def __init__(self, db_path: Optional[str] = None, conn: Optional[sqlite3.Connection] = None,
-                 *, apply_pragmas: bool = True) -> None:
+                 *, apply_pragmas: bool = True, cache_mb: int = 64, mmap_mb: int = 256) -> None:
         if conn is not None:
             self._conn = conn
             self._own_conn = False
         elif db_path is not None:
-            self._conn = sqlite3.connect(db_path)
+            # 自动提交模式：事务完全由 bulk_transaction 的显式 BEGIN / COMMIT 控制
+            self._conn = sqlite3.connect(db_path, cached_statements=256, isolation_level=None)
             self._own_conn = True
         else:
             raise ValueError("Either db_path or conn must be provided.")
@@ -39,6 +215,16 @@ class HotItemsHistoryDB:
             # 更稳健的默认 PRAGMA（不涉及 DDL）
             self._conn.execute("PRAGMA journal_mode = WAL;")
             self._conn.execute("PRAGMA synchronous = NORMAL;")
+            # 页缓存（负数单位为 KiB）与临时表/排序放内存，减少读路径上的重复 I/O
+            self._conn.execute(f"PRAGMA cache_size = {-int(cache_mb) * 1024};")
+            self._conn.execute("PRAGMA temp_store = MEMORY;")
+            if mmap_mb > 0 and self._db_bytes() >= self._MMAP_MIN_DB_BYTES:
+                self._conn.execute(f"PRAGMA mmap_size = {int(mmap_mb) * 1024 * 1024};")
+
+        self._fts: Optional[bool] = None
+        self._indexes: Optional[set[str]] = None
+        self._tx_depth = 0
+        self._writer: Optional[_WriterThread] = None
 
     # ---------- lifecycle ----------
     @property
@@ -46,10 +232,67 @@ class HotItemsHistoryDB:
         return self._conn
 
     def close(self) -> None:
+        if self._writer is not None:
+            # 先让写线程处理完已入队的批次再退出
+            self._writer.q.put(None)
+            self._writer.join()
+            self._writer = None
         if self._own_conn and self._conn:
             self._conn.close()
 
+    @contextmanager
+    def bulk_transaction(self) -> Iterator[None]:
+        """
+        把多次写入合并为一个事务（一次提交、一次 fsync）：
+            with db.bulk_transaction():
+                for platform, items in batches:
+                    db.upsert_history(platform, items)
+        可嵌套；已处于事务中时（外层 bulk_transaction 或调用方自己开启的）改用 SAVEPOINT：
+        内层出错只回滚到本层开始处，异常照常抛出，由外层决定继续还是放弃，最终由外层负责提交。
+        """
+        outermost = not (self._tx_depth or self._conn.in_transaction)
+        savepoint = None
+        if outermost:
+            self._conn.execute("BEGIN IMMEDIATE;")
+        else:
+            savepoint = f"bulk_{self._tx_depth}"
+            self._conn.execute(f"SAVEPOINT {savepoint};")
+        self._tx_depth += 1
+        try:
+            yield
+        except BaseException:
+            if outermost:
+                self._conn.rollback()
+            else:
+                self._conn.execute(f"ROLLBACK TO {savepoint};")
+                self._conn.execute(f"RELEASE {savepoint};")
+            raise
+        else:
+            if outermost:
+                try:
+                    self._conn.commit()
+                except BaseException:
+                    # 提交失败（如 database is locked）时结束事务，连接可继续使用
+                    self._conn.rollback()
+                    raise
+            else:
+                self._conn.execute(f"RELEASE {savepoint};")
+        finally:
+            self._tx_depth -= 1
+
     # ---------- helpers ----------
+    def _db_bytes(self) -> int:
+        page_count = self._conn.execute("PRAGMA page_count;").fetchone()[0]
+        page_size = self._conn.execute("PRAGMA page_size;").fetchone()[0]
+        return int(page_count) * int(page_size)
+
+    def _db_file(self) -> str:
+        """当前连接 main 库的文件路径（内存库为空串）"""
+        for _, name, path in self._conn.execute("PRAGMA database_list;"):
+            if name == "main":
+                return path or ""
+        return ""
+
     @staticmethod
     def _as_int(x) -> Optional[int]:
         if x is None or x == "":
@@ -65,85 +308,209 @@ class HotItemsHistoryDB:
     @staticmethod
     def _escape_like(s: str) -> str:
         # 转义 SQLite LIKE 特殊字符 % _
-        return s.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        return s.translate(_LIKE_TRANS)
 
-    # ---------- writes ----------
-    def upsert_history(
+    @staticmethod
+    def _fts_phrase(s: str) -> str:
+        # 整体作为 FTS5 短语，避免关键词中的运算符被解析
+        return '"' + s.replace('"', '""') + '"'
+
+    def _has_fts(self) -> bool:
+        """全文索引表 hot_items_fts 是否存在（见 ensure_fts），结果缓存在实例上"""
+        if self._fts is None:
+            cur = self._conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'hot_items_fts';"
+            )
+            self._fts = cur.fetchone() is not None
+        return self._fts
+
+    def _has_index(self, name: str) -> bool:
+        if self._indexes is None:
+            cur = self._conn.execute("SELECT name FROM sqlite_master WHERE type = 'index';")
+            self._indexes = {r[0] for r in cur.fetchall()}
+        return name in self._indexes
+
+    def _where(
         self,
-        platform: str,
-        items: Iterable[Mapping[str, Any]],
-        *,
-        topic_key_field: str | None = None,
-        tags_join_from: str | None = None,
-        extra_fields: list[str] | None = None
-    ) -> int:
+        keyword: str | None,
+        platforms: Sequence[str] | None,
+        date_from: str | None,
+        date_to: str | None,
+    ) -> tuple[str, dict[str, Any]]:
+        """count_history / query_history 共用的 WHERE 子句，使用命名参数（同一个值只绑定一次）"""
+        sql = " WHERE 1=1"
+        params: dict[str, Any] = {}
+
+        if platforms:
+            placeholders = ",".join(f":p{i}" for i in range(len(platforms)))
+            sql += f" AND platform IN ({placeholders})"
+            params.update((f"p{i}", p) for i, p in enumerate(platforms))
+
+        if keyword:
+            if len(keyword) >= self._FTS_MIN_CHARS and self._has_fts():
+                # 倒排索引先取出匹配的 rowid，再与其余条件组合
+                sql += " AND id IN (SELECT rowid FROM hot_items_fts WHERE hot_items_fts MATCH :q)"
+                params["q"] = self._fts_phrase(keyword)
+            else:
+                sql += " AND (title LIKE :kw ESCAPE '\\' OR excerpt LIKE :kw ESCAPE '\\' OR url LIKE :kw ESCAPE '\\')"
+                params["kw"] = f"%{self._escape_like(keyword)}%"
+
+        if date_from and date_from == date_to:
+            # 单日写成等值条件，(platform, scraped_date, ...) 索引的后续列才能直接用于排序
+            sql += " AND scraped_date = :date_from"
+            params["date_from"] = date_from
+        else:
+            if date_from:
+                sql += " AND scraped_date >= :date_from"
+                params["date_from"] = date_from
+            if date_to:
+                sql += " AND scraped_date <= :date_to"
+                params["date_to"] = date_to
+
+        return sql, params
+
+    # ---------- schema（可选） ----------
+    def ensure_fts(self, rebuild: bool = False) -> None:
         """
-        items 中通用字段（能取到多少取多少）：
-          title, url, image_url, excerpt, heat_text, heat_value/num, rank, spans, scraped_at, extra...
+        创建关键词检索用的 FTS5 全文索引 hot_items_fts 及同步触发器（可重复执行）。
+        首次创建时为已有数据补建索引，rebuild=True 时强制重建。
+        未调用时 count_history / query_history 的关键词条件回退为 LIKE 全表扫描。
         """
-        extra_fields = extra_fields or []
-
-        sql = """
-        INSERT INTO hot_items_history
-          (platform, topic_key, title, url, image_url, excerpt,
-           heat_text, heat_value, rank, tags_text, scraped_at, scraped_date, extra_json)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ON CONFLICT(platform, url, scraped_date) DO UPDATE SET
-          topic_key=excluded.topic_key,
-          title=excluded.title,
-          image_url=excluded.image_url,
-          excerpt=excluded.excerpt,
-          heat_text=excluded.heat_text,
-          heat_value=excluded.heat_value,
-          rank=excluded.rank,
-          tags_text=excluded.tags_text,
-          scraped_at=excluded.scraped_at,
-          extra_json=excluded.extra_json
+        existed = self._has_fts()
+        self._conn.executescript(_FTS_DDL)
+        if rebuild or not existed:
+            with self.bulk_transaction():
+                self._conn.execute("INSERT INTO hot_items_fts(hot_items_fts) VALUES ('rebuild');")
+        self._fts = True
+
+    def create_recommended_indexes(self) -> None:
+        """
+        按需创建与 query_history 查询模式匹配的复合索引（platform, scraped_date, 排序列）。
+        属于可选优化：不调用时查询照常工作。只有“单个平台 + 单日”按热度排序的查询
+        能直接沿索引顺序读取并在 LIMIT 处停止，query_history 仅对这种查询用 INDEXED BY 指定；
+        多平台或日期区间的查询交给查询规划器自行选择（强制指定反而会多一次临时排序）。
         """
+        with self.bulk_transaction():
+            for ddl in self._RECOMMENDED_INDEXES.values():
+                self._conn.execute(ddl)
+        self._indexes = None
+
+    # ---------- writes ----------
+    def _iter_rows(
+        self,
+        platform: str,
+        items: Iterable[Mapping[str, Any]],
+        topic_key_field: str | None,
+        tags_join_from: str | None,
+        extra_fields: list[str],
+    ) -> Iterator[tuple[Any, ...]]:
+        """逐条生成待写入的参数元组，跳过缺少标题或链接的条目"""
+        # 缺失 scraped_at 时统一用本批次的时间，只格式化一次
+        now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        today_str = now_str[:10]
+        # 平台名在每一行里重复出现，驻留后各批次共享同一个字符串对象
+        platform = sys.intern(platform)
+        has_extras = bool(extra_fields)
 
-        rows: list[tuple[Any, ...]] = []
         for it in items:
-            title = (it.get("title") or "").strip()
-            url = (it.get("url") or "").strip()
-            scraped_at = (it.get("scraped_at") or "").strip()
+            get = it.get
+            title = (get("title") or "").strip()
+            url = (get("url") or "").strip()
+            scraped_at = (get("scraped_at") or "").strip()
             if not (title and url):
                 continue
 
-            # scraped_at 若缺失则用当前时间
+            # scraped_at 固定为 "YYYY-MM-DD HH:MM:SS"，日期即前 10 个字符
             if not scraped_at:
-                scraped_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            scraped_date = scraped_at.split(" ")[0]
+                scraped_at = now_str
+                scraped_date = today_str
+            else:
+                scraped_date = scraped_at[:10]
 
-            image_url = it.get("image_url")
-            excerpt = it.get("excerpt")
-            heat_text = it.get("heat_text")
-            heat_value = self._as_int(it.get("heat_value", it.get("num")))
-            rank = self._as_int(it.get("rank"))
+            image_url = get("image_url")
+            excerpt = get("excerpt")
+            heat_text = get("heat_text")
+            heat_value = self._as_int(get("heat_value", get("num")))
+            rank = self._as_int(get("rank"))
 
             tags_text = None
-            if tags_join_from and isinstance(it.get(tags_join_from), (list, tuple)):
+            if tags_join_from and isinstance(get(tags_join_from), (list, tuple)):
                 tags = [str(x).strip() for x in it[tags_join_from] if str(x).strip()]
                 tags_text = "|".join(tags) if tags else None
 
-            topic_key = it.get(topic_key_field) if topic_key_field else None
+            topic_key = get(topic_key_field) if topic_key_field else None
 
-            extra = {}
-            for k in extra_fields:
-                if k in it:
-                    extra[k] = it[k]
-            extra_json = json.dumps(extra, ensure_ascii=False) if extra else None
+            extra = {k: it[k] for k in extra_fields if k in it} if has_extras else None
+            extra_json = _dumps(extra) if extra else None
 
-            rows.append((
+            yield (
                 platform, topic_key, title, url, image_url, excerpt,
                 heat_text, heat_value, rank, tags_text, scraped_at, scraped_date, extra_json
-            ))
+            )
 
-        if not rows:
+    def upsert_history(
+        self,
+        platform: str,
+        items: Iterable[Mapping[str, Any]],
+        *,
+        topic_key_field: str | None = None,
+        tags_join_from: str | None = None,
+        extra_fields: list[str] | None = None
+    ) -> int:
+        """
+        items 中通用字段（能取到多少取多少）：
+          title, url, image_url, excerpt, heat_text, heat_value/num, rank, spans, scraped_at, extra...
+        返回写入（插入或更新）的条数。
+        """
+        extra_fields = extra_fields or []
+
+        # 行惰性生成、由 executemany 逐条消费，不在内存中攒整批列表
+        rows = self._iter_rows(platform, items, topic_key_field, tags_join_from, extra_fields)
+        first = next(rows, None)
+        if first is None:
             return 0
 
-        cur = self._conn.executemany(sql, rows)
-        self._conn.commit()
-        return cur.rowcount
+        count = 0
+
+        def counted() -> Iterator[tuple[Any, ...]]:
+            nonlocal count
+            for row in chain((first,), rows):
+                count += 1
+                yield row
+
+        # 整批在同一个事务里写入；若外层已有 bulk_transaction，则并入外层事务统一提交
+        with self.bulk_transaction():
+            self._conn.executemany(_UPSERT_SQL, counted())
+        return count
+
+    def upsert_history_async(
+        self,
+        platform: str,
+        items: Iterable[Mapping[str, Any]],
+        *,
+        topic_key_field: str | None = None,
+        tags_join_from: str | None = None,
+        extra_fields: list[str] | None = None
+    ) -> Future[int]:
+        """
+        参数同 upsert_history，但只在当前线程整理好行数据，写入交给后台写线程，立即返回 Future；
+        future.result() 为写入条数（或抛出写入时的异常）。批次按调用顺序依次提交。
+        写线程使用独立连接，因此要求基于文件的数据库；close() 会等待已入队的批次写完。
+        """
+        rows = list(self._iter_rows(platform, items, topic_key_field, tags_join_from, extra_fields or []))
+        fut: Future[int] = Future()
+        if not rows:
+            fut.set_result(0)
+            return fut
+
+        if self._writer is None:
+            db_file = self._db_file()
+            if not db_file:
+                raise ValueError("upsert_history_async requires a file-backed database.")
+            self._writer = _WriterThread(db_file)
+            self._writer.start()
+        self._writer.q.put((rows, fut))
+        return fut
 
     # ---------- reads ----------
     def list_platforms(self) -> list[str]:
@@ -160,25 +527,8 @@ class HotItemsHistoryDB:
         date_from: str | None = None,   # "YYYY-MM-DD"
         date_to: str | None = None      # "YYYY-MM-DD"
     ) -> int:
-        sql = "SELECT COUNT(*) FROM hot_items_history WHERE 1=1"
-        params: list[Any] = []
-
-        if platforms:
-            placeholders = ",".join("?" for _ in platforms)
-            sql += f" AND platform IN ({placeholders})"
-            params.extend(platforms)
-
-        if keyword:
-            kw = f"%{self._escape_like(keyword)}%"
-            sql += " AND (title LIKE ? ESCAPE '\\' OR excerpt LIKE ? ESCAPE '\\' OR url LIKE ? ESCAPE '\\')"
-            params.extend([kw, kw, kw])
-
-        if date_from:
-            sql += " AND scraped_date >= ?"
-            params.append(date_from)
-        if date_to:
-            sql += " AND scraped_date <= ?"
-            params.append(date_to)
+        where_sql, params = self._where(keyword, platforms, date_from, date_to)
+        sql = "SELECT COUNT(*) FROM hot_items_history" + where_sql
 
         cur = self._conn.execute(sql, params)
         return int(cur.fetchone()[0])
@@ -192,11 +542,16 @@ class HotItemsHistoryDB:
         date_to: str | None = None,     # "YYYY-MM-DD"
         order_by: str = "scraped_at DESC",   # 或 heat_value DESC / rank ASC 等
         limit: int = 50,
-        offset: int = 0
+        offset: int = 0,
+        after_key: Any = None,
+        after_id: int | None = None
     ) -> list[dict[str, Any]]:
         """
         返回列表，每条包含：
         id, platform, scraped_date, scraped_at, rank, title, url, heat_text, heat_value, excerpt, image_url, tags_text
+
+        keyset 翻页：传入上一页最后一行的排序列值 after_key 与 id after_id，
+        直接从索引位置继续读取（此时忽略 offset）。
         """
         if order_by not in self._ALLOWED_ORDERS:
             order_by = "scraped_at DESC"
@@ -205,32 +560,49 @@ class HotItemsHistoryDB:
         SELECT id, platform, scraped_date, scraped_at, rank, title, url,
                heat_text, heat_value, excerpt, image_url, tags_text
         FROM hot_items_history
-        WHERE 1=1
         """
-        params: list[Any] = []
-
-        if platforms:
-            placeholders = ",".join("?" for _ in platforms)
-            sql += f" AND platform IN ({placeholders})"
-            params.extend(platforms)
-
-        if keyword:
-            kw = f"%{self._escape_like(keyword)}%"
-            sql += " AND (title LIKE ? ESCAPE '\\' OR excerpt LIKE ? ESCAPE '\\' OR url LIKE ? ESCAPE '\\')"
-            params.extend([kw, kw, kw])
-
-        if date_from:
-            sql += " AND scraped_date >= ?"
-            params.append(date_from)
-        if date_to:
-            sql += " AND scraped_date <= ?"
-            params.append(date_to)
-
-        sql += f" ORDER BY {order_by} LIMIT ? OFFSET ?"
-        params.extend([limit, offset])
-
-        cur = self._conn.execute(sql, params)
-        cols = [d[0] for d in cur.description]
-        return [dict(zip(cols, row)) for row in cur.fetchall()]
+        # 只有单平台、单日时 (platform, scraped_date) 都是等值条件，索引顺序才与 ORDER BY 一致；
+        # 仅当推荐索引已创建时才加提示，否则 INDEXED BY 会直接报错
+        if (order_by == "heat_value DESC" and platforms and len(platforms) == 1
+                and date_from and date_from == date_to
+                and self._has_index(self._HEAT_INDEX)):
+            sql += f" INDEXED BY {self._HEAT_INDEX}"
+        where_sql, params = self._where(keyword, platforms, date_from, date_to)
+        sql += where_sql
+
+        if after_id is not None:
+            sql += self._SEEK_CLAUSES[(order_by, after_key is None)]
+            params["after_key"] = after_key
+            params["after_id"] = after_id
+            offset = 0
+
+        sql += f" ORDER BY {self._ORDER_SQL[order_by]} LIMIT :limit OFFSET :offset"
+        params["limit"] = limit
+        params["offset"] = offset
+
+        # 只在本游标上启用 sqlite3.Row（不影响共享连接上的其他查询），逐行直接转 dict；
+        # 仍返回普通 dict，便于 st.cache_data 序列化
+        cur = self._conn.cursor()
+        cur.row_factory = sqlite3.Row
+        return [dict(row) for row in cur.execute(sql, params)]
+
+    def query_history_page(
+        self,
+        *,
+        order_by: str = "scraped_at DESC",
+        limit: int = 50,
+        **kwargs: Any
+    ) -> tuple[list[dict[str, Any]], tuple[Any, int] | None]:
+        """
+        参数同 query_history，额外返回下一页的 keyset 游标 (排序列值, id)，
+        可直接作为下一次调用的 after_key / after_id；本页不满 limit 时说明已到末尾，返回 None。
+        """
+        rows = self.query_history(order_by=order_by, limit=limit, **kwargs)
+        if len(rows) < limit:
+            return rows, None
+        if order_by not in self._ALLOWED_ORDERS:
+            order_by = "scraped_at DESC"
+        last = rows[-1]
+        return rows, (last[order_by.split()[0]], last["id"])
 
 